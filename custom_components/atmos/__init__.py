@@ -1,29 +1,73 @@
 """The AtmosEnergy integration."""
+import asyncio
 import logging
 
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.config_entries import ConfigEntry
 
+from .const import DOMAIN
+from .coordinator import AtmosEnergyCoordinator, async_remove_stored_usage
+
 _LOGGER = logging.getLogger(__name__)
-DOMAIN = "atmosenergy"
 
-SENSORS = []
+# Cap how many accounts the update service refreshes against Atmos at once.
+MAX_CONCURRENT_REFRESHES = 2
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the AtmosEnergy component."""
     async def handle_update(call: ServiceCall):
         _LOGGER.debug("Manual update service called")
-        for sensor in SENSORS:
-            sensor.update()
-            sensor.async_write_ha_state()
+        coordinators = dict(hass.data.get(DOMAIN, {}))
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REFRESHES)
+
+        async def refresh(coordinator):
+            async with semaphore:
+                await coordinator.async_refresh()
+
+        # async_refresh records failures on the coordinator instead of raising,
+        # so one failing account never cuts the others short.
+        await asyncio.gather(*(refresh(coordinator) for coordinator in coordinators.values()))
+        for entry_id, coordinator in coordinators.items():
+            if not coordinator.last_update_success:
+                _LOGGER.error(
+                    "Manual update of entry %s failed: %s", entry_id, coordinator.last_exception
+                )
     hass.services.async_register(DOMAIN, "update", handle_update)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Set up AtmosEnergy from a config entry."""
-    await hass.config_entries.async_forward_entry_setups(config_entry, ["sensor"])
+    coordinator = AtmosEnergyCoordinator(hass, config_entry)
+    # Usage stored by the last run is served at once. Without it the first
+    # download runs in the background so setup never waits on Atmos; unload
+    # cancels that task before it closes the session.
+    try:
+        if not await coordinator.async_restore():
+            coordinator.async_start_refresh_task("initial refresh")
+        hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = coordinator
+        await hass.config_entries.async_forward_entry_setups(config_entry, ["sensor"])
+    except Exception:
+        hass.data.get(DOMAIN, {}).pop(config_entry.entry_id, None)
+        # The session is not cleaned up automatically, so a failed or retried
+        # setup must close it, after stopping any refresh already started.
+        await coordinator.async_cancel_refresh_task()
+        await coordinator.async_shutdown()
+        await coordinator.async_close()
+        raise
     return True
 
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Unload an AtmosEnergy config entry."""
-    return await hass.config_entries.async_unload_platforms(config_entry, ["sensor"])
+    unload_ok = await hass.config_entries.async_unload_platforms(config_entry, ["sensor"])
+    if unload_ok:
+        coordinator = hass.data[DOMAIN].pop(config_entry.entry_id)
+        # Home Assistant only cancels the entry's background tasks after this
+        # returns, so stop the refresh here before its session is closed.
+        await coordinator.async_cancel_refresh_task()
+        await coordinator.async_shutdown()
+        await coordinator.async_close()
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove the stored usage of a deleted AtmosEnergy config entry."""
+    await async_remove_stored_usage(hass, config_entry.entry_id)
@@ -5,8 +5,9 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
 
+from .const import DOMAIN
+
 _LOGGER = logging.getLogger(__name__)
-DOMAIN = "atmosenergy"
 
 DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_USERNAME): str,
@@ -0,0 +1,442 @@
+"""Data update coordinator for AtmosEnergy."""
+import asyncio
+import contextlib
+import io
+import logging
+import re
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
+
+import aiohttp
+from python_calamine import CalamineWorkbook
+
+from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# How long a login is reused before authenticating again.
+AUTH_TTL = timedelta(minutes=30)
+# Bound every Atmos request so a stalled connection cannot hang the update.
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=60, connect=5)
+# Transient gateway errors on the download are retried after these delays.
+_RETRY_STATUSES = frozenset({502, 503, 504})
+_RETRY_DELAYS = (0.3, 0.6)
+# Usage stored by the last run is served at startup; once it is older than
+# the update interval a refresh also runs in the background.
+STORAGE_VERSION = 1
+
+_ONE_DAY = timedelta(days=1)
+
+# Thousands separators, currency signs and spaces found in text number cells.
+_NUMBER_STRIP = str.maketrans("", "", ",$ ")
+
+# Workbook columns copied from the latest row into the Latest sensor attributes.
+_ATTRIBUTE_COLUMNS = (
+    ("Weather Date", "weather date"),
+    ("Avg Temp", "Avg Temp"),
+    ("High Temp", "High Temp"),
+    ("Low Temp", "Low Temp"),
+)
+
+_LOGIN_PAGE_URL = "https://www.atmosenergy.com/accountcenter/logon/login.html"
+_LOGIN_URL = "https://www.atmosenergy.com/accountcenter/logon/authenticate.html"
+_USAGE_DOWNLOAD_URL = "https://www.atmosenergy.com/accountcenter/usagehistory/dailyUsageDownload.html"
+
+# Browser-like headers passed on every Atmos request. They cannot be session
+# defaults: Home Assistant replaces a client session's default headers with
+# its own User-Agent when it creates the session.
+_HEADERS = MappingProxyType({
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+    # Replaces aiohttp's default Accept-Encoding, so only list codings it can
+    # decode; br is decoded because Brotli is a manifest requirement.
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Content-Type": "application/x-www-form-urlencoded",
+    "DNT": "1",
+    "Host": "www.atmosenergy.com",
+    "Origin": "https://www.atmosenergy.com",
+    "Pragma": "no-cache",
+    "Referer": _LOGIN_PAGE_URL,
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "same-origin",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1",
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36"
+    ),
+    "sec-ch-ua": "\"Not(A:Brand\";v=\"99\", \"Google Chrome\";v=\"133\", \"Chromium\";v=\"133\"",
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": "macOS"
+})
+
+# The hidden formId input is the only thing read from the login page, so it is
+# located with a byte scan instead of building an HTML tree.
+_FORM_ID_INPUT_RE = re.compile(rb"<input\b[^>]*\bname=[\"']formId[\"'][^>]*>", re.IGNORECASE)
+_VALUE_ATTR_RE = re.compile(rb"\svalue=[\"']([^\"']*)[\"']", re.IGNORECASE)
+
+def _to_number(value):
+    """Return a cell as a float, or None if it does not hold a number."""
+    if isinstance(value, str):
+        try:
+            return float(value.translate(_NUMBER_STRIP))
+        except ValueError:
+            return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+def _to_date(value):
+    """Return a cell as a date, or None if it does not hold one."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        for date_format in ("%m/%d/%Y", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(value.strip(), date_format).date()
+            except ValueError:
+                pass
+    return None
+
+def _usage_store(hass, entry_id):
+    """Return the store holding the last downloaded usage of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+async def async_remove_stored_usage(hass, entry_id):
+    """Delete the stored usage of a removed config entry."""
+    await _usage_store(hass, entry_id).async_remove()
+
+def _parse_usage(xls_file):
+    """Parse the usage workbook in a single pass over its rows (runs in the executor).
+
+    Only the latest row is kept while the Consumption column is summed, so no
+    DataFrame or row list is ever built.
+    """
+    rows = CalamineWorkbook.from_filelike(xls_file).get_sheet_by_index(0).iter_rows()
+    header = next(rows, None)
+    if header is None:
+        raise UpdateFailed("Excel file is empty.")
+
+    # One header scan; every column lookup afterwards is a dict hit.
+    columns = {name: index for index, name in enumerate(header)}
+    if "Consumption" not in columns:
+        raise UpdateFailed(
+            f"Excel data does not include 'Consumption' column. Columns: {header}"
+        )
+    consumption_index = columns["Consumption"]
+
+    latest_record = None
+    latest = None
+    cumulative = 0.0
+    days = 0
+    for row in rows:
+        if not any(row):
+            continue
+        # Each Consumption cell is converted exactly once; the latest value is
+        # kept from this pass rather than converted again afterwards.
+        latest = _to_number(row[consumption_index])
+        if latest is not None:
+            cumulative += latest
+            days += 1
+        latest_record = row
+
+    if latest_record is None:
+        raise UpdateFailed("Excel file is empty.")
+
+    if latest is None:
+        raise UpdateFailed(
+            f"Consumption value is not numeric: {latest_record[consumption_index]!r}"
+        )
+
+    latest_date = None
+    if "Weather Date" in columns:
+        latest_date = _to_date(latest_record[columns["Weather Date"]])
+
+    # Built once per refresh; state reads hand out this same dict.
+    attributes = {
+        attribute: latest_record[columns[column]]
+        for column, attribute in _ATTRIBUTE_COLUMNS
+        if column in columns
+    }
+
+    return {
+        "latest": latest,
+        "cumulative": cumulative,
+        "latest_date": latest_date,
+        "attributes": attributes,
+        "cumulative_attributes": {"number_of_days": days},
+    }
+
+class AtmosEnergyCoordinator(DataUpdateCoordinator):
+    """Fetch the Atmos daily usage workbook once for every sensor of an account."""
+
+    def __init__(self, hass, config_entry):
+        """Initialize the coordinator for one Atmos account."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=config_entry,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+        )
+        self._username = config_entry.data.get(CONF_USERNAME)
+        self._password = config_entry.data.get(CONF_PASSWORD)
+        # Dedicated session so the login cookies stay out of the shared jar.
+        self._session = async_create_clientsession(hass, auto_cleanup=False)
+        self._authenticated_at = None
+        # formId sent with the login, reused until a login with it fails.
+        self._form_id = None
+        # Set once a login without the scraped formId has been rejected.
+        self._form_id_required = False
+        # Validators of the workbook behind self.data, for conditional GETs.
+        self._etag = None
+        self._last_modified = None
+        # Last downloaded usage, kept so a restart does not have to fetch it again.
+        self._store = _usage_store(hass, config_entry.entry_id)
+        # Background refresh started at setup, cancelled before the session closes.
+        self._refresh_task = None
+
+    @callback
+    def async_start_refresh_task(self, name):
+        """Start a refresh in a background task tied to the config entry."""
+        self._refresh_task = self.config_entry.async_create_background_task(
+            self.hass, self.async_refresh(), f"{DOMAIN} {name} {self.config_entry.entry_id}"
+        )
+
+    async def async_cancel_refresh_task(self):
+        """Cancel a background refresh that is still running and wait for it."""
+        task, self._refresh_task = self._refresh_task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    async def async_close(self):
+        """Close the Atmos session."""
+        await self._session.close()
+
+    async def async_restore(self):
+        """Serve the stored usage from the last run, revalidating it if stale.
+
+        Returns False when nothing usable is stored, in which case the caller
+        has to start the first refresh.
+        """
+        stored = await self._store.async_load()
+        if not stored:
+            return False
+        fetched_at = dt_util.parse_datetime(stored["fetched_at"])
+        if fetched_at is None:
+            return False
+        age = dt_util.utcnow() - fetched_at
+
+        data = stored["data"]
+        if data["latest_date"] is not None:
+            data["latest_date"] = date.fromisoformat(data["latest_date"])
+        self._etag = stored["etag"]
+        self._last_modified = stored["last_modified"]
+        self.async_set_updated_data(data)
+
+        if age >= self.update_interval:
+            _LOGGER.debug("Stored Atmos usage is %s old, refreshing in the background", age)
+            self.async_start_refresh_task("refresh")
+        return True
+
+    async def _async_save(self, data, fetched_at):
+        """Store the usage and its validators for the next startup."""
+        latest_date = data["latest_date"]
+        await self._store.async_save({
+            "fetched_at": fetched_at.isoformat(),
+            "etag": self._etag,
+            "last_modified": self._last_modified,
+            "data": {
+                **data,
+                "latest_date": latest_date.isoformat() if latest_date is not None else None,
+            },
+        })
+
+    async def _async_update_data(self):
+        """Download and parse the usage workbook; only the parse runs in the executor."""
+        # One clock read serves the freshness check and every timestamp below.
+        now = dt_util.utcnow()
+        if self.data is not None and self.data["latest_date"] is not None:
+            # Atmos publishes each day's usage at the earliest the next day, so
+            # once yesterday's record is in hand there is nothing newer to fetch.
+            if self.data["latest_date"] >= dt_util.as_local(now).date() - _ONE_DAY:
+                _LOGGER.debug("Atmos usage is already current, skipping download")
+                return self.data
+
+        try:
+            download = await self._async_download(now)
+        except TimeoutError as err:
+            raise UpdateFailed("Timed out talking to Atmos Energy") from err
+        except aiohttp.ClientError as err:
+            raise UpdateFailed(f"Error talking to Atmos Energy: {err}") from err
+
+        if download is None:
+            # 304 Not Modified: the workbook behind self.data is still current,
+            # so only record that it was confirmed.
+            self.data["attributes"]["last_updated"] = now.isoformat(timespec="seconds")
+            await self._async_save(self.data, now)
+            return self.data
+        xls_file, etag, last_modified = download
+
+        try:
+            data = await self.hass.async_add_executor_job(_parse_usage, xls_file)
+        except UpdateFailed:
+            raise
+        except Exception as err:
+            raise UpdateFailed(f"Error reading Excel file: {err}") from err
+        data["attributes"]["last_updated"] = now.isoformat(timespec="seconds")
+
+        self._etag = etag
+        self._last_modified = last_modified
+        await self._async_save(data, now)
+        _LOGGER.debug(
+            "Fetched Atmos usage: latest %s, cumulative %s", data["latest"], data["cumulative"]
+        )
+        return data
+
+    async def _async_download(self, now):
+        """Download the usage workbook, logging in first when needed.
+
+        Returns None when the server reports the cached workbook unchanged,
+        otherwise a (buffer, etag, last_modified) tuple.
+        """
+        # The trailing timestamp only busts caches, so whole seconds are enough.
+        params = {"billingPeriod": "Current", "_": int(now.timestamp())}
+
+        conditional_headers = {}
+        if self.data is not None:
+            if self._etag:
+                conditional_headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                conditional_headers["If-Modified-Since"] = self._last_modified
+
+        relogged = False
+        retry_delays = iter(_RETRY_DELAYS)
+        while True:
+            if not self._login_is_fresh(now):
+                await self._async_login(now)
+
+            # Stream the workbook straight into the parse buffer instead of
+            # buffering it in the response and copying it again.
+            async with self._session.get(
+                _USAGE_DOWNLOAD_URL,
+                params=params,
+                headers={**_HEADERS, **conditional_headers},
+                timeout=REQUEST_TIMEOUT,
+            ) as xls_resp:
+                if xls_resp.status == 304:
+                    _LOGGER.debug("Usage workbook not modified since the last download")
+                    return None
+                if xls_resp.status == 401 or xls_resp.url.path.endswith("/login.html"):
+                    self._authenticated_at = None
+                    if relogged:
+                        # The login was answered as accepted but not honoured.
+                        # Drop its formId so the next login scrapes a fresh one.
+                        self._form_id = None
+                        if self._form_id_required:
+                            raise UpdateFailed(
+                                "Failed to download XLS data: session was not accepted after login"
+                            )
+                        _LOGGER.debug("Login without a formId was not honoured, fetching the login page")
+                        self._form_id_required = True
+                        continue
+                    # The cached login expired upstream; authenticate again once.
+                    _LOGGER.debug("Atmos session expired, logging in again")
+                    relogged = True
+                    continue
+                if xls_resp.status in _RETRY_STATUSES:
+                    delay = next(retry_delays, None)
+                    if delay is not None:
+                        _LOGGER.debug("Atmos returned %s, retrying in %.1f s", xls_resp.status, delay)
+                        xls_resp.release()
+                        await asyncio.sleep(delay)
+                        continue
+                if xls_resp.status != 200:
+                    raise UpdateFailed(f"Failed to download XLS data. Status code: {xls_resp.status}")
+                xls_file = io.BytesIO()
+                async for chunk in xls_resp.content.iter_chunked(65536):
+                    xls_file.write(chunk)
+                etag = xls_resp.headers.get("ETag")
+                last_modified = xls_resp.headers.get("Last-Modified")
+                content_encoding = xls_resp.headers.get("Content-Encoding")
+
+            _LOGGER.debug(
+                "XLS download complete: %d bytes (Content-Encoding: %s)",
+                xls_file.tell(),
+                content_encoding,
+            )
+            xls_file.seek(0)
+            return xls_file, etag, last_modified
+
+    def _login_is_fresh(self, now):
+        """Return True if the session still holds a recent Atmos login."""
+        return (
+            self._authenticated_at is not None
+            and now - self._authenticated_at < AUTH_TTL
+            and len(self._session.cookie_jar) > 0
+        )
+
+    async def _async_login(self, now):
+        """Log in to the Atmos account center.
+
+        The login is first tried with an empty formId, which skips the login
+        page GET. Only if that is rejected is the page fetched for its formId.
+        The formId in use is kept for the lifetime of the session and fetched
+        again if a login using it is rejected.
+        """
+        while True:
+            fetched_form_id = False
+            if self._form_id is None:
+                if self._form_id_required:
+                    self._form_id = await self._async_fetch_form_id()
+                    fetched_form_id = True
+                else:
+                    self._form_id = ""
+            payload = {
+                "username": self._username,
+                "password": self._password,
+                "formId": self._form_id
+            }
+            async with self._session.post(
+                _LOGIN_URL, data=payload, headers=_HEADERS, timeout=REQUEST_TIMEOUT
+            ) as auth_resp:
+                status = auth_resp.status
+                # A rejected login lands back on the login page.
+                accepted = status in (200, 304) and not auth_resp.url.path.endswith("/login.html")
+            if accepted:
+                # Stamped with the refresh start, so the TTL errs on the short side.
+                self._authenticated_at = now
+                return
+            self._authenticated_at = None
+            self._form_id = None
+            if fetched_form_id:
+                raise UpdateFailed(f"Authentication failed with status code: {status}")
+            self._form_id_required = True
+
+    async def _async_fetch_form_id(self):
+        """Fetch the login page and return its hidden formId value."""
+        async with self._session.get(
+            _LOGIN_PAGE_URL, headers=_HEADERS, timeout=REQUEST_TIMEOUT
+        ) as resp:
+            login_page = await resp.read()
+        form_id_input = _FORM_ID_INPUT_RE.search(login_page)
+        if form_id_input:
+            value = _VALUE_ATTR_RE.search(form_id_input.group(0))
+            if value:
+                return value.group(1).decode()
+        return ""